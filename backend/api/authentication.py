@@ -0,0 +1,119 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_expired(token):
+    """True if TOKEN_EXPIRE_AFTER (seconds) is set and the token is older than that."""
+    lifetime = getattr(settings, 'TOKEN_EXPIRE_AFTER', None)
+    return bool(lifetime) and token.created + timedelta(seconds=lifetime) < timezone.now()
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> (user, token, expires_at).
+    Entries live at most TOKEN_CACHE_TTL seconds, which also bounds how long
+    another worker process can keep serving a token deleted elsewhere.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, user, token):
+        ttl = settings.TOKEN_CACHE_TTL
+        lifetime = getattr(settings, 'TOKEN_EXPIRE_AFTER', None)
+        if lifetime:
+            # Never cache past the moment the token itself expires
+            remaining = (token.created + timedelta(seconds=lifetime) - timezone.now()).total_seconds()
+            ttl = min(ttl, remaining)
+        with self._lock:
+            self._entries[key] = (user, token, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v[0].pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the token + user query for recently seen tokens."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        if token_expired(token):
+            token.delete()
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        token_cache.set(key, token.user, token)
+        return (token.user, token)
+
+
+class TokenIssuanceBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication that, with BASIC_AUTH_TOKEN_ONLY on, only runs on views
+    marked allow_basic_auth (the token endpoint). Everywhere else the PBKDF2
+    password check is skipped and the request falls through to other classes.
+    """
+
+    def authenticate(self, request):
+        if getattr(settings, 'BASIC_AUTH_TOKEN_ONLY', False):
+            view = request.parser_context.get('view') if request.parser_context else None
+            if not getattr(view, 'allow_basic_auth', False):
+                return None
+        return super().authenticate(request)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_changed_user(sender, instance, **kwargs):
+    # Deactivation or a password change should not wait out the cache TTL
+    token_cache.discard_user(instance.pk)
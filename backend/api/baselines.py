@@ -0,0 +1,140 @@
+import math
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from .ingest import NUMERIC_COLUMNS
+from .models import ParameterBaseline
+
+# Log-bucket quantile sketch (DDSketch style): every estimate is within 1% of the
+# true value, and two sketches merge by adding their bucket counts
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+SKETCH_LOG_GAMMA = math.log(SKETCH_GAMMA)
+# Flagged rows stored per dataset, worst first; anomaly_count still has the full total
+MAX_STORED_ANOMALIES = 1000
+
+
+def empty_sketch():
+    return {'pos': {}, 'neg': {}, 'zero': 0}
+
+
+def sketch_add(sketch, values):
+    """Merge an array of values into a sketch dict in one vectorized pass."""
+    # NaN and inf have no bucket (log(inf) would overflow the int64 key)
+    values = values[np.isfinite(values)]
+    for side, part in (('pos', values[values > 0]), ('neg', -values[values < 0])):
+        if not len(part):
+            continue
+        keys, counts = np.unique(np.ceil(np.log(part) / SKETCH_LOG_GAMMA).astype(np.int64), return_counts=True)
+        buckets = sketch[side]
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[str(key)] = buckets.get(str(key), 0) + count
+    sketch['zero'] += int((values == 0).sum())
+    return sketch
+
+
+def sketch_quantile(sketch, q):
+    # Walk buckets from the most negative value to the most positive
+    ordered = [(int(k), c, -1) for k, c in sorted(sketch['neg'].items(), key=lambda b: -int(b[0]))]
+    ordered += [(None, sketch['zero'], 0)]
+    ordered += [(int(k), c, 1) for k, c in sorted(sketch['pos'].items(), key=lambda b: int(b[0]))]
+
+    total = sum(c for _, c, _ in ordered)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for key, count, sign in ordered:
+        seen += count
+        if seen > rank:
+            if sign == 0:
+                return 0.0
+            return sign * 2 * SKETCH_GAMMA ** key / (SKETCH_GAMMA + 1)
+    return None
+
+
+def batch_stats(df):
+    """Count, mean and sum of squared deviations per (type, parameter) for one upload."""
+    # Same float64 reduction as summarize(), the parsed columns are float32.
+    # Non-finite values are left out, an inf would turn mean and m2 into NaN
+    numeric = df[NUMERIC_COLUMNS].astype('float64')
+    grouped = numeric.where(np.isfinite(numeric)).groupby(df['Type'], observed=True)
+    count = grouped.count()
+    mean = grouped.mean()
+    m2 = grouped.var(ddof=0) * count
+    return count, mean, m2
+
+
+def flag_anomalies(df):
+    """
+    Vectorized z-score of every row against the stored per-type baselines.
+    Only baselines with at least ANOMALY_MIN_COUNT samples are trusted.
+    Returns (total flagged, worst flagged rows).
+    """
+    baselines = ParameterBaseline.objects.filter(count__gte=settings.ANOMALY_MIN_COUNT)
+    table = pd.DataFrame.from_records(
+        baselines.values('equipment_type', 'parameter', 'count', 'mean', 'm2'),
+        columns=['equipment_type', 'parameter', 'count', 'mean', 'm2']
+    )
+    if table.empty:
+        return 0, []
+
+    table['std'] = np.sqrt(table['m2'] / table['count'])
+    means = table.pivot(index='equipment_type', columns='parameter', values='mean')
+    stds = table.pivot(index='equipment_type', columns='parameter', values='std')
+    means = means.reindex(columns=NUMERIC_COLUMNS)
+    stds = stds.reindex(columns=NUMERIC_COLUMNS).replace(0, np.nan)
+
+    types = df['Type'].astype(str)
+    row_means = means.reindex(types).to_numpy()
+    row_stds = stds.reindex(types).to_numpy()
+    values = df[NUMERIC_COLUMNS].to_numpy(dtype='float64')
+    values = np.where(np.isfinite(values), values, np.nan)
+    with np.errstate(invalid='ignore'):
+        z = (values - row_means) / row_stds
+        flagged = np.abs(z) > settings.ANOMALY_Z_THRESHOLD
+
+    rows, cols = np.nonzero(flagged)
+    worst = np.argsort(-np.abs(z[rows, cols]), kind='stable')[:MAX_STORED_ANOMALIES]
+    rows, cols = rows[worst], cols[worst]
+    names = df['Equipment Name'].astype(str).to_numpy()
+    return int(flagged.sum()), [
+        {
+            'row': int(r),
+            'equipment_name': names[r],
+            'type': types.iat[r],
+            'parameter': NUMERIC_COLUMNS[c],
+            # Values were parsed as float32; its shortest repr is the number in the CSV
+            'value': float(str(np.float32(values[r, c]))),
+            'baseline_mean': round(float(row_means[r, c]), 4),
+            'z_score': round(float(z[r, c]), 2),
+        }
+        for r, c in zip(rows.tolist(), cols.tolist())
+    ]
+
+
+def update_baselines(df):
+    """Fold one upload into the running baselines (Chan's parallel mean/variance merge)."""
+    count, mean, m2 = batch_stats(df)
+    with transaction.atomic():
+        for eq_type in count.index:
+            for param in NUMERIC_COLUMNS:
+                n_b = int(count.at[eq_type, param])
+                if not n_b:
+                    continue
+                baseline, _ = ParameterBaseline.objects.select_for_update().get_or_create(
+                    equipment_type=str(eq_type), parameter=param,
+                    defaults={'sketch': empty_sketch()}
+                )
+                mean_b = float(mean.at[eq_type, param])
+                n = baseline.count + n_b
+                delta = mean_b - baseline.mean
+                baseline.m2 += float(m2.at[eq_type, param]) + delta * delta * baseline.count * n_b / n
+                baseline.mean += delta * n_b / n
+                baseline.count = n
+
+                values = df.loc[df['Type'] == eq_type, param].to_numpy(dtype='float64')
+                baseline.sketch = sketch_add(baseline.sketch or empty_sketch(), values)
+                baseline.save()
+
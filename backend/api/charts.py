@@ -0,0 +1,132 @@
+import os
+import glob
+import tempfile
+import matplotlib
+matplotlib.use('Agg')  # Headless backend, the server has no display
+from matplotlib.figure import Figure
+from django.conf import settings
+from .ingest import read_equipment_csv
+from .storage import open_raw
+
+CHART_KINDS = ('distribution', 'scatter')
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+CHART_DPI = 100
+MIN_SIZE, MAX_SIZE = 100, 2000
+# Scatter plots are sampled down to this many points, enough to show the shape
+MAX_SCATTER_POINTS = 5000
+
+
+def cache_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'charts')
+
+
+def chart_path(dataset_id, kind, width, height, fmt):
+    return os.path.join(cache_dir(), f"{dataset_id}_{kind}_{width}x{height}.{fmt}")
+
+
+def get_chart(dataset, kind, width, height, fmt='png'):
+    """
+    Open a rendered chart for reading, rendering it only on a cache miss.
+    Cache hits bump the file mtime, which is what LRU eviction sorts on.
+    The file is opened before any eviction, so the handle stays readable
+    even if another request evicts the chart meanwhile. The caller closes it.
+    """
+    path = chart_path(dataset.id, kind, width, height, fmt)
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # Evicted since we opened it, the handle still reads fine
+        return f
+
+    fig = render_chart(dataset, kind, width, height)
+    os.makedirs(cache_dir(), exist_ok=True)
+    # Write under a temp name so concurrent requests never serve a half-written file
+    fd, tmp = tempfile.mkstemp(dir=cache_dir(), prefix='.tmp', suffix=f".{fmt}")
+    with os.fdopen(fd, 'wb') as out:
+        fig.savefig(out, format=fmt)
+    f = open(tmp, 'rb')
+    os.replace(tmp, path)
+    evict_charts(keep=path)
+    return f
+
+
+def render_chart(dataset, kind, width, height):
+    fig = Figure(figsize=(width / CHART_DPI, height / CHART_DPI), dpi=CHART_DPI)
+
+    if kind == 'distribution':
+        # Same bar + pie layout the desktop client draws
+        distribution = dataset.type_distribution
+        ax1 = fig.add_subplot(121)
+        ax1.bar(list(distribution.keys()), list(distribution.values()), color='#4F46E5')
+        ax1.set_title("Equipment Distribution")
+        ax1.tick_params(axis='x', rotation=45)
+
+        ax2 = fig.add_subplot(122)
+        if distribution:
+            ax2.pie(
+                list(distribution.values()),
+                labels=list(distribution.keys()),
+                autopct='%1.1f%%',
+                startangle=90
+            )
+        ax2.set_title("Type Share")
+    else:
+        # Row-level view: pressure against temperature, one colour per type
+        with open_raw(dataset) as f:
+            df, _ = read_equipment_csv(f)
+        if len(df) > MAX_SCATTER_POINTS:
+            df = df.sample(MAX_SCATTER_POINTS, random_state=0)
+        ax = fig.add_subplot(111)
+        for eq_type, group in df.groupby('Type', observed=True):
+            ax.scatter(group['Pressure'], group['Temperature'], label=str(eq_type), s=20)
+        ax.set_xlabel("Pressure")
+        ax.set_ylabel("Temperature")
+        ax.set_title("Pressure vs Temperature")
+        ax.legend(fontsize='small')
+
+    fig.tight_layout()
+    return fig
+
+
+def evict_charts(keep=None):
+    """
+    Drop least recently used charts until the cache fits CHART_CACHE_MAX_BYTES.
+    keep (the chart just rendered) is never dropped, even if it alone is over the limit.
+    """
+    entries = []
+    for path in glob.glob(os.path.join(cache_dir(), '*_*_*x*.*')):
+        if path == keep:
+            continue
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if keep is not None:
+        try:
+            total += os.path.getsize(keep)
+        except FileNotFoundError:
+            pass
+    for _, size, path in sorted(entries):
+        if total <= settings.CHART_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def clear_charts(dataset_id):
+    for path in glob.glob(os.path.join(cache_dir(), f"{dataset_id}_*")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
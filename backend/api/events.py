@@ -0,0 +1,131 @@
+import json
+import asyncio
+import threading
+from collections import deque
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from .authentication import CachedTokenAuthentication
+
+# Recent events kept for clients reconnecting with Last-Event-ID
+HISTORY_SIZE = 200
+# Per-client backlog; a client that falls this far behind is dropped and must reconnect
+QUEUE_SIZE = 100
+KEEPALIVE_SECONDS = 15
+
+
+class EventBroker:
+    """
+    In-process pub/sub between the sync views that publish and the async
+    SSE responses that stream. With several worker processes each one only
+    sees its own events, so run a single ASGI worker or put a shared bus behind this.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._next_id = 1
+
+    def publish(self, event, data, user_id=None):
+        with self._lock:
+            message = (self._next_id, event, data, user_id)
+            self._next_id += 1
+            self._history.append(message)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, queue, message)
+            except RuntimeError:
+                # Loop already closed, the client is gone
+                self.unsubscribe((loop, queue))
+
+    def _deliver(self, loop, queue, message):
+        if (loop, queue) not in self._subscribers:
+            return
+        if queue.qsize() >= QUEUE_SIZE:
+            # The spare slot holds the sentinel that ends the stream
+            self.unsubscribe((loop, queue))
+            queue.put_nowait(None)
+        else:
+            queue.put_nowait(message)
+
+    def subscribe(self, last_id=None):
+        """Register the running loop; returns (subscription, events missed since last_id)."""
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE + 1))
+        with self._lock:
+            self._subscribers.add(subscription)
+            missed = [m for m in self._history if last_id is not None and m[0] > last_id]
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+broker = EventBroker()
+
+
+def publish(event, data, user_id=None):
+    """Queue an event for all subscribers, or only for user_id's streams when given."""
+    broker.publish(event, data, user_id)
+
+
+def format_event(message):
+    event_id, event, data, _ = message
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def visible_to(message, user_id):
+    return message[3] is None or message[3] == user_id
+
+
+async def event_stream(last_id, user_id):
+    subscription, missed = broker.subscribe(last_id)
+    queue = subscription[1]
+    try:
+        yield "retry: 3000\n\n"
+        for message in missed:
+            if visible_to(message, user_id):
+                yield format_event(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                break
+            if visible_to(message, user_id):
+                yield format_event(message)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def dataset_events(request):
+    """
+    Server-sent events for new datasets and ingest progress.
+    dataset-created is public like the dataset list; ingest-progress only reaches
+    the uploader, identified by the same Token header as the REST API.
+    Needs the ASGI entry point (config.asgi); under WSGI the stream would tie up a worker.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Event stream needs the ASGI server (config.asgi)"}, status=503
+        )
+    try:
+        auth = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed as e:
+        return JsonResponse({"error": str(e.detail)}, status=401)
+    user_id = auth[0].pk if auth else None
+
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_id = None
+    response = StreamingHttpResponse(event_stream(last_id, user_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
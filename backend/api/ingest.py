@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+# Columns every uploaded CSV must provide
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+# Typed schema used for parsing: small categorical for Type, float32 for numerics
+CSV_SCHEMA = {
+    'Equipment Name': 'string',
+    'Type': 'category',
+    'Flowrate': 'float32',
+    'Pressure': 'float32',
+    'Temperature': 'float32',
+}
+
+# The same schema as Arrow types, for reading with pyarrow directly
+if pa is not None:
+    ARROW_SCHEMA = {
+        'Equipment Name': pa.string(),
+        'Type': pa.dictionary(pa.int32(), pa.string()),
+        'Flowrate': pa.float32(),
+        'Pressure': pa.float32(),
+        'Temperature': pa.float32(),
+    }
+
+class InvalidCSV(ValueError):
+    """The uploaded file itself was rejected (unparseable, missing columns); retrying won't help."""
+
+
+# Physically valid (min, max) range per numeric column, None means unbounded
+VALUE_RANGES = {
+    'Flowrate': (0, None),
+    'Pressure': (0, None),
+    'Temperature': (-273.15, None),
+}
+
+
+def read_typed_csv(source):
+    """Fast path: parse straight into the typed schema, raising on any non-numeric value."""
+    if pa is None:
+        return pd.read_csv(source, dtype=CSV_SCHEMA, engine='c')
+    table = pa_csv.read_csv(source, convert_options=pa_csv.ConvertOptions(
+        column_types=ARROW_SCHEMA, strings_can_be_null=True
+    ))
+    # self_destruct frees each Arrow column once converted, so the two copies never
+    # coexist (pandas' own pyarrow engine peaks higher than the untyped C parser)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def read_equipment_csv(source):
+    """
+    Parse an equipment CSV with the typed schema.
+    Returns (df, invalid) where invalid counts non-numeric values per numeric column.
+    """
+    try:
+        df = read_typed_csv(source)
+        return df, pd.Series(0, index=NUMERIC_COLUMNS)
+    except (ValueError, TypeError, KeyError):
+        # Fast path rejects text in numeric columns or a missing column,
+        # so fall back to a lenient parse and coerce the numerics ourselves
+        if hasattr(source, 'seek'):
+            source.seek(0)
+
+    df = pd.read_csv(source, engine='c')
+    present = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    raw = df[present]
+    coerced = raw.apply(pd.to_numeric, errors='coerce').astype('float32')
+    invalid = (coerced.isna() & raw.notna()).sum()
+    df[present] = coerced
+    for col, dtype in CSV_SCHEMA.items():
+        if col in df.columns and col not in present:
+            df[col] = df[col].astype(dtype)
+    return df, invalid.reindex(NUMERIC_COLUMNS, fill_value=0)
+
+
+def quality_report(df, invalid):
+    """
+    Count missing, invalid and out-of-range values per column, one vectorized pass
+    per column so temporaries never exceed a single column's size.
+    Out-of-range and infinite numerics are masked to NaN in place so they don't skew the stats.
+    """
+    columns = {}
+    valid = np.ones(len(df), dtype=bool)
+    for col in REQUIRED_COLUMNS:
+        missing = df[col].isna().to_numpy()
+        infinite = np.zeros(len(df), dtype=bool)
+        out_of_range = np.zeros(len(df), dtype=bool)
+        if col in VALUE_RANGES:
+            lo, hi = VALUE_RANGES[col]
+            values = df[col].to_numpy()
+            # inf, or anything past the float32 maximum, is not a usable reading
+            infinite = np.isinf(values)
+            if lo is not None:
+                out_of_range |= values < lo
+            if hi is not None:
+                out_of_range |= values > hi
+            out_of_range &= ~infinite
+            if infinite.any() or out_of_range.any():
+                df[col] = df[col].mask(infinite | out_of_range)
+        valid &= ~(missing | infinite | out_of_range)
+        # Text coerced to NaN during parsing is already counted in invalid, not missing
+        parse_invalid = int(invalid.get(col, 0))
+        columns[col] = {
+            'missing': int(missing.sum()) - parse_invalid,
+            'invalid': parse_invalid + int(infinite.sum()),
+            'out_of_range': int(out_of_range.sum()),
+        }
+    return {
+        'rows': len(df),
+        'valid_rows': int(valid.sum()),
+        'columns': columns,
+    }
+
+
+def summarize(df):
+    """Summary stats stored on EquipmentDataset, skipping NaNs left by the quality pass."""
+    # Reduce in float64 (float32 storage is only for the parsed columns),
+    # one column at a time to keep the upcast copy small
+    means = {col: df[col].astype('float64').mean() for col in NUMERIC_COLUMNS}
+    # The inputs only carry float32 precision; its shortest repr drops the parse noise
+    means = {col: float(str(np.float32(mean))) if pd.notna(mean) else 0.0 for col, mean in means.items()}
+    return {
+        'total_count': len(df),
+        'avg_flowrate': means['Flowrate'],
+        'avg_pressure': means['Pressure'],
+        'avg_temperature': means['Temperature'],
+        'type_distribution': {str(k): int(v) for k, v in df['Type'].value_counts(sort=True).items() if v},
+    }
+
+
+def process_csv(source):
+    """
+    Full ingest pipeline for one upload: typed parse, column check, quality pass and stats.
+    Returns (stats, df) and raises ValueError when required columns are missing.
+    """
+    df, invalid = read_equipment_csv(source)
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+
+    report = quality_report(df, invalid)
+    stats = summarize(df)
+    stats['quality_report'] = report
+    return stats, df
+
+
+def ingest_upload(source, save, serialize, discard=None):
+    """
+    Shared ingest for direct and chunked uploads: parse, score against the baselines,
+    then save the dataset and fold it into the baselines in one transaction.
+    save(stats) creates the EquipmentDataset and serialize(dataset) returns its API
+    representation, which is returned and published once the transaction commits.
+    discard(dataset) handles the stored file if the transaction rolls back (default: delete it).
+    Raises InvalidCSV when the file is rejected; any other error may be worth retrying.
+    """
+    # These modules import from this one
+    from .baselines import flag_anomalies, update_baselines
+    from .events import publish
+    from .storage import compress_after_commit
+
+    try:
+        stats, df = process_csv(source)
+    except ValueError as e:
+        raise InvalidCSV(str(e)) from e
+    # Score against history before this upload joins the baselines
+    stats['anomaly_count'], stats['anomalies'] = flag_anomalies(df)
+
+    dataset = None
+    try:
+        with transaction.atomic():
+            dataset = save(stats)
+            update_baselines(df)
+            compress_after_commit(dataset)
+            data = serialize(dataset)
+            transaction.on_commit(lambda: publish('dataset-created', data))
+    except Exception:
+        # The row was rolled back, don't leave its file behind
+        if dataset is not None and dataset.file:
+            if discard is not None:
+                discard(dataset)
+            else:
+                dataset.file.storage.delete(dataset.file.name)
+        raise
+    return data
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from api.storage import apply_policy, space_report
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class Command(BaseCommand):
+    help = "Expire abandoned upload sessions, compress leftover uploads and apply the raw-file retention and quota policy."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would happen without changing files")
+
+    def handle(self, *args, **options):
+        summary = apply_policy(dry_run=options['dry_run'])
+        prefix = "Would have" if options['dry_run'] else "Have"
+        self.stdout.write(
+            f"{prefix} compressed {summary['compressed']} file(s), evicted {summary['evicted']} "
+            f"({_mb(summary['freed_bytes'])} freed). Raw files now use {_mb(summary['stored_bytes'])}."
+        )
+        self.stdout.write(
+            f"{prefix} expired {summary['expired_uploads']} unfinished upload(s) "
+            f"and removed {summary['removed_partials']} partial file(s)."
+        )
+
+        report = space_report()
+        if report['raw_bytes']:
+            saved = 1 - report['stored_bytes'] / report['raw_bytes']
+            self.stdout.write(
+                f"{report['datasets']} compressed dataset(s): {_mb(report['stored_bytes'])} on disk "
+                f"for {_mb(report['raw_bytes'])} of CSV ({saved:.0%} saved)."
+            )
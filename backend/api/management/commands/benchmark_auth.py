@@ -0,0 +1,60 @@
+import time
+import base64
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from api.authentication import CachedTokenAuthentication, token_cache
+
+
+class Command(BaseCommand):
+    help = "Measure requests per second spent in authentication, before and after the token cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--basic-requests', type=int, default=10,
+                            help="Basic auth runs a full password hash per request, so keep this small")
+
+    def handle(self, *args, **options):
+        # Everything happens inside a transaction that is rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user('benchmark-auth', password='benchmark-auth-password')
+            token = Token.objects.create(user=user)
+            factory = APIRequestFactory()
+            basic = base64.b64encode(b'benchmark-auth:benchmark-auth-password').decode()
+
+            runs = [
+                ("BasicAuthentication", BasicAuthentication, options['basic_requests'],
+                 {'HTTP_AUTHORIZATION': f'Basic {basic}'}),
+                ("TokenAuthentication", TokenAuthentication, options['requests'],
+                 {'HTTP_AUTHORIZATION': f'Token {token.key}'}),
+                ("CachedTokenAuthentication", CachedTokenAuthentication, options['requests'],
+                 {'HTTP_AUTHORIZATION': f'Token {token.key}'}),
+            ]
+            token_cache.clear()
+            for name, auth_class, count, headers in runs:
+                view = self.make_view(auth_class)
+                start = time.perf_counter()
+                for _ in range(count):
+                    response = view(factory.get('/bench/', **headers))
+                    assert response.status_code == 200, response.status_code
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{name:<28} {count / elapsed:>10.1f} req/s  ({count} requests)")
+
+            transaction.set_rollback(True)
+        token_cache.clear()
+
+    @staticmethod
+    def make_view(auth_class):
+        class BenchView(APIView):
+            authentication_classes = [auth_class]
+            permission_classes = [IsAuthenticated]
+
+            def get(self, request):
+                return Response({})
+        return BenchView.as_view()
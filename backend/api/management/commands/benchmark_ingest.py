@@ -0,0 +1,111 @@
+import os
+import sys
+import argparse
+import json
+import time
+import resource
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.ingest import process_csv
+
+TYPES = ['Pump', 'Valve', 'Compressor', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+def untyped_ingest(path):
+    """The ingest before the typed schema: default read_csv, then the plain means."""
+    df = pd.read_csv(path)
+    stats = {
+        'avg_flowrate': df['Flowrate'].mean(),
+        'avg_pressure': df['Pressure'].mean(),
+        'avg_temperature': df['Temperature'].mean(),
+        'type_distribution': df['Type'].value_counts().to_dict(),
+    }
+    return stats, df
+
+
+def typed_ingest(path):
+    return process_csv(path)
+
+
+PATHS = {'untyped': untyped_ingest, 'typed': typed_ingest}
+
+
+def peak_rss_kb():
+    """
+    Peak resident memory of this process in KiB. On Linux VmHWM is read because
+    ru_maxrss carries over the parent's peak through fork/exec.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = "Measure parse time and peak memory of the CSV ingest, untyped read_csv against process_csv."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=3)
+        # Internal: run one path in this (fresh) process and print its numbers
+        parser.add_argument('--worker', choices=list(PATHS), help=argparse.SUPPRESS)
+        parser.add_argument('--csv', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            return self.run_worker(options['worker'], options['csv'])
+
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        try:
+            self.write_csv(path, options['rows'])
+            self.stdout.write(f"{options['rows']} rows, {os.path.getsize(path) / (1024 * 1024):.1f} MB of CSV")
+            for name in PATHS:
+                # Each run gets its own process so peak RSS isn't inherited from the previous one
+                runs = [self.spawn(name, path) for _ in range(options['repeat'])]
+                best = min(runs, key=lambda run: run['seconds'])
+                self.stdout.write(
+                    f"{name:<8} {best['seconds']:>6.2f} s  peak +{best['peak_mb']:>6.1f} MB  "
+                    f"frame {best['frame_mb']:>6.1f} MB  (best of {len(runs)})"
+                )
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def write_csv(path, rows):
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            'Equipment Name': [f"Unit-{i}" for i in range(rows)],
+            'Type': rng.choice(TYPES, rows),
+            'Flowrate': rng.normal(120, 30, rows).round(1),
+            'Pressure': rng.normal(6, 1.5, rows).round(2),
+            'Temperature': rng.normal(110, 15, rows).round(1),
+        }).to_csv(path, index=False)
+
+    @staticmethod
+    def spawn(name, path):
+        output = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_ingest', '--worker', name, '--csv', path],
+            check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def run_worker(self, name, path):
+        before = peak_rss_kb()
+        start = time.perf_counter()
+        _, df = PATHS[name](path)
+        seconds = time.perf_counter() - start
+        peak = peak_rss_kb()
+        self.stdout.write(json.dumps({
+            'seconds': seconds,
+            'peak_mb': (peak - before) / 1024,
+            'frame_mb': df.memory_usage(deep=True).sum() / (1024 * 1024),
+        }))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='quality_report',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='anomalies',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='anomaly_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ParameterBaseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_type', models.CharField(max_length=100)),
+                ('parameter', models.CharField(max_length=50)),
+                ('count', models.BigIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('sketch', models.JSONField(default=dict)),
+            ],
+            options={
+                'unique_together': {('equipment_type', 'parameter')},
+            },
+        ),
+    ]
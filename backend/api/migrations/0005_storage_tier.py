@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_parameterbaseline_anomalies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='archived_to',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='raw_size',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -12,6 +13,56 @@ class EquipmentDataset(models.Model):
     avg_pressure = models.FloatField(default=0.0)
     avg_temperature = models.FloatField(default=0.0)
     type_distribution = models.JSONField(default=dict) 
+    # Per-column counts of missing / invalid / out-of-range values found at ingest
+    quality_report = models.JSONField(default=dict, blank=True)
+    # Rows far off their type's fleet baseline at upload time (served by the anomalies action)
+    anomaly_count = models.IntegerField(default=0)
+    anomalies = models.JSONField(default=list, blank=True)
+    # Storage tier: uncompressed size once the file is compressed, and where the
+    # retention policy archived it (file is emptied once the raw data is gone)
+    raw_size = models.BigIntegerField(default=0)
+    archived_to = models.CharField(max_length=500, blank=True, default='')
 
     def __str__(self):
-        return f"Dataset {self.id} - {self.uploaded_at}"
\ No newline at end of file
+        return f"Dataset {self.id} - {self.uploaded_at}"
+
+class UploadSession(models.Model):
+    """A resumable upload in progress; chunks are written straight into one partial file."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uploader = models.ForeignKey(User, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def __str__(self):
+        return f"Upload {self.id} - {self.filename}"
+
+
+class UploadChunk(models.Model):
+    session = models.ForeignKey(UploadSession, related_name='chunks', on_delete=models.CASCADE)
+    index = models.IntegerField()
+
+    class Meta:
+        unique_together = ('session', 'index')
+
+
+
+class ParameterBaseline(models.Model):
+    """Running fleet statistics for one parameter of one equipment type, updated at every ingest."""
+    equipment_type = models.CharField(max_length=100)
+    parameter = models.CharField(max_length=50)
+    count = models.BigIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)  # Sum of squared deviations from the mean
+    sketch = models.JSONField(default=dict)  # Mergeable quantile sketch, see api.baselines
+
+    class Meta:
+        unique_together = ('equipment_type', 'parameter')
+
+    def __str__(self):
+        return f"{self.equipment_type} {self.parameter} (n={self.count})"
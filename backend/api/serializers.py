@@ -1,8 +1,51 @@
 from rest_framework import serializers
-from .models import EquipmentDataset
+from django.conf import settings
+from .models import EquipmentDataset, UploadSession, ParameterBaseline
+from .baselines import sketch_quantile
 
 class EquipmentDatasetSerializer(serializers.ModelSerializer):
+    # Whether the retention policy moved the raw file to the archive; the server path stays private
+    archived = serializers.SerializerMethodField()
+
     class Meta:
         model = EquipmentDataset
-        fields = '__all__'
-        read_only_fields = ('total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature', 'type_distribution', 'uploader')
\ No newline at end of file
+        exclude = ('anomalies', 'archived_to')
+        read_only_fields = ('total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature', 'type_distribution', 'quality_report', 'anomaly_count', 'raw_size', 'uploader')
+
+    def get_archived(self, obj):
+        return bool(obj.archived_to)
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ('id', 'filename', 'total_size', 'chunk_size', 'total_chunks', 'received_chunks', 'created_at')
+        read_only_fields = ('chunk_size',)
+
+    def validate_total_size(self, value):
+        if value < 0:
+            raise serializers.ValidationError("total_size must not be negative")
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"total_size must not exceed {settings.UPLOAD_MAX_SIZE} bytes")
+        return value
+
+    def get_received_chunks(self, obj):
+        return sorted(obj.chunks.values_list('index', flat=True))
+
+
+
+class ParameterBaselineSerializer(serializers.ModelSerializer):
+    std = serializers.SerializerMethodField()
+    quantiles = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ParameterBaseline
+        fields = ('equipment_type', 'parameter', 'count', 'mean', 'std', 'quantiles')
+
+    def get_std(self, obj):
+        return (obj.m2 / obj.count) ** 0.5 if obj.count else None
+
+    def get_quantiles(self, obj):
+        return {f"p{int(q * 100)}": sketch_quantile(obj.sketch, q) for q in (0.05, 0.5, 0.95, 0.99)}
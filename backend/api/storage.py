@@ -0,0 +1,171 @@
+import os
+import gzip
+import shutil
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import EquipmentDataset
+from .uploads import expire_sessions
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COPY_BLOCK = 1024 * 1024
+
+
+def _zstd_open(path, mode):
+    if zstandard is None:
+        raise RuntimeError("zstd storage needs the zstandard package")
+    return zstandard.open(path, mode)
+
+
+# Compression name -> (file suffix, opener)
+COMPRESSORS = {
+    'gzip': ('.gz', lambda path, mode: gzip.open(path, mode, compresslevel=6)),
+    'zstd': ('.zst', _zstd_open),
+}
+
+
+def _compressor_for(name):
+    for suffix, opener in COMPRESSORS.values():
+        if name.endswith(suffix):
+            return opener
+    return None
+
+
+class RawDataUnavailable(Exception):
+    """The raw file was evicted or archived by the retention policy; stats remain."""
+
+
+def open_raw(dataset):
+    """Open a dataset's CSV for reading, decompressing on the fly when it is stored compressed."""
+    if not dataset.file:
+        raise RawDataUnavailable(f"Raw data for dataset {dataset.id} is no longer retained")
+    path = dataset.file.path
+    opener = _compressor_for(dataset.file.name)
+    return opener(path, 'rb') if opener else open(path, 'rb')
+
+
+def compress_dataset(dataset_id):
+    """Replace a dataset's plain CSV with a compressed copy and remember its raw size."""
+    compression = settings.STORAGE_COMPRESSION
+    if not compression:
+        return
+    dataset = EquipmentDataset.objects.filter(pk=dataset_id).first()
+    if dataset is None or not dataset.file or _compressor_for(dataset.file.name):
+        return
+
+    suffix, opener = COMPRESSORS[compression]
+    src = dataset.file.path
+    dst_name = default_storage.get_available_name(dataset.file.name + suffix)
+    dst = default_storage.path(dst_name)
+    tmp = dst + '.tmp'
+    try:
+        with open(src, 'rb') as fin, opener(tmp, 'wb') as fout:
+            raw_size = os.fstat(fin.fileno()).st_size
+            shutil.copyfileobj(fin, fout, COPY_BLOCK)
+    except FileNotFoundError:
+        # Evicted by the retention policy before we got to it
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    os.replace(tmp, dst)
+
+    # Only switch over if nothing else moved the file in the meantime
+    updated = EquipmentDataset.objects.filter(pk=dataset_id, file=dataset.file.name).update(
+        file=dst_name, raw_size=raw_size
+    )
+    os.remove(dst if not updated else src)
+
+
+def _compress_in_background(dataset_id):
+    try:
+        compress_dataset(dataset_id)
+    finally:
+        # The thread opened its own DB connection
+        connection.close()
+
+
+def compress_after_commit(dataset):
+    """Compress in the background once the ingest transaction is committed."""
+    if not settings.STORAGE_COMPRESSION:
+        return
+    transaction.on_commit(lambda: threading.Thread(
+        target=_compress_in_background, args=(dataset.pk,), daemon=True
+    ).start())
+
+
+def stored_size(dataset):
+    try:
+        return os.path.getsize(dataset.file.path)
+    except (OSError, ValueError):
+        return 0
+
+
+def evict_raw(dataset):
+    """Drop (or archive, if RAW_ARCHIVE_DIR is set) the raw file but keep the dataset row and stats."""
+    path = dataset.file.path
+    archived_to = ''
+    if os.path.exists(path):
+        if settings.RAW_ARCHIVE_DIR:
+            os.makedirs(settings.RAW_ARCHIVE_DIR, exist_ok=True)
+            archived_to = os.path.join(settings.RAW_ARCHIVE_DIR, f"{dataset.id}_{os.path.basename(path)}")
+            shutil.move(path, archived_to)
+        else:
+            os.remove(path)
+    EquipmentDataset.objects.filter(pk=dataset.pk).update(file='', archived_to=archived_to)
+
+
+def apply_policy(dry_run=False):
+    """
+    Expire abandoned upload sessions, compress leftover plain files, then evict raw
+    files older than RAW_RETENTION_DAYS and the oldest ones beyond RAW_QUOTA_BYTES.
+    Returns a summary dict.
+    """
+    summary = {'compressed': 0, 'evicted': 0, 'freed_bytes': 0}
+    summary['expired_uploads'], summary['removed_partials'] = expire_sessions(dry_run)
+    retained = list(EquipmentDataset.objects.exclude(file='').order_by('uploaded_at'))
+
+    for dataset in retained:
+        if not _compressor_for(dataset.file.name) and settings.STORAGE_COMPRESSION:
+            summary['compressed'] += 1
+            if not dry_run:
+                compress_dataset(dataset.pk)
+                dataset.refresh_from_db()
+
+    sizes = {dataset.pk: stored_size(dataset) for dataset in retained}
+    total = sum(sizes.values())
+    cutoff = None
+    if settings.RAW_RETENTION_DAYS is not None:
+        cutoff = timezone.now() - timedelta(days=settings.RAW_RETENTION_DAYS)
+    quota = settings.RAW_QUOTA_BYTES
+
+    # Oldest first: past the retention window, or still over quota
+    for dataset in retained:
+        expired = cutoff is not None and dataset.uploaded_at < cutoff
+        over_quota = quota is not None and total > quota
+        if not (expired or over_quota):
+            continue
+        summary['evicted'] += 1
+        summary['freed_bytes'] += sizes[dataset.pk]
+        total -= sizes[dataset.pk]
+        if not dry_run:
+            evict_raw(dataset)
+
+    summary['stored_bytes'] = total
+    return summary
+
+
+def space_report():
+    """Bytes on disk for compressed files against the size of the CSVs they replaced."""
+    compressed = EquipmentDataset.objects.exclude(file='').filter(raw_size__gt=0)
+    raw = stored = 0
+    for dataset in compressed:
+        raw += dataset.raw_size
+        stored += stored_size(dataset)
+    return {'datasets': compressed.count(), 'raw_bytes': raw, 'stored_bytes': stored}
@@ -1,3 +1,556 @@
-from django.test import TestCase
+import os
+import asyncio
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+from .baselines import (
+    empty_sketch, sketch_add, sketch_quantile, update_baselines, flag_anomalies, SKETCH_ACCURACY
+)
+from .charts import cache_dir, evict_charts, render_chart
+from .events import broker, publish
+from .ingest import read_equipment_csv, process_csv
+from .models import EquipmentDataset, ParameterBaseline, UploadSession
+from .storage import apply_policy, compress_dataset, evict_raw, open_raw, stored_size
+from .uploads import partial_path
 
-# Create your tests here.
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_csv(rows):
+    lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+    lines += [f"{name},{eq_type},{flow},{pressure},{temp}" for name, eq_type, flow, pressure, temp in rows]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def random_rows(rng, count, eq_type='Pump', prefix='P'):
+    values = rng.normal([100, 5, 80], [10, 1, 5], size=(count, 3)).round(2)
+    return [(f"{prefix}{i}", eq_type, *row) for i, row in enumerate(values.tolist())]
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, STORAGE_COMPRESSION=None)
+class ApiTestCase(TestCase):
+    def setUp(self):
+        # Dataset ids are reused after each rollback, so cached files must not outlive a test
+        self.addCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name='data.csv'):
+        return self.client.post(
+            '/api/datasets/', {'file': SimpleUploadedFile(name, content)}, format='multipart'
+        )
+
+
+class IngestTests(SimpleTestCase):
+    def parse(self, text):
+        return process_csv(SimpleUploadedFile('q.csv', text.encode()))
+
+    def test_typed_schema(self):
+        df, invalid = read_equipment_csv(SimpleUploadedFile('t.csv', make_csv([('P1', 'Pump', 1.5, 2, 3)])))
+        self.assertIsInstance(df['Type'].dtype, pd.CategoricalDtype)
+        for col in ('Flowrate', 'Pressure', 'Temperature'):
+            self.assertEqual(df[col].dtype, np.float32)
+        self.assertEqual(invalid.tolist(), [0, 0, 0])
+
+    def test_quality_report_counts(self):
+        stats, _ = self.parse(
+            "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+            "P1,Pump,abc,2,3\n"
+            "P2,Pump,10,-5,4\n"
+            "P3,,20,,5\n"
+            "P4,Pump,inf,3,1e39\n"
+            "P5,Valve,30,4,-300\n"
+            "P6,Valve,40,5,6\n"
+        )
+        report = stats['quality_report']
+        self.assertEqual(report['rows'], 6)
+        self.assertEqual(report['valid_rows'], 1)
+        self.assertEqual(report['columns']['Flowrate'], {'missing': 0, 'invalid': 2, 'out_of_range': 0})
+        self.assertEqual(report['columns']['Pressure'], {'missing': 1, 'invalid': 0, 'out_of_range': 1})
+        self.assertEqual(report['columns']['Temperature'], {'missing': 0, 'invalid': 1, 'out_of_range': 1})
+        self.assertEqual(report['columns']['Type'], {'missing': 1, 'invalid': 0, 'out_of_range': 0})
+        # Rejected cells are left out of the averages
+        self.assertAlmostEqual(stats['avg_flowrate'], 25.0)
+        self.assertAlmostEqual(stats['avg_pressure'], 3.5)
+        self.assertAlmostEqual(stats['avg_temperature'], 4.5)
+
+    def test_means_carry_no_float32_noise(self):
+        stats, _ = self.parse(make_csv([
+            ('P1', 'Pump', 119.8, 5.2, 110.1), ('P2', 'Pump', 119.8, 6.4, 120.2), ('P3', 'Pump', 119.8, 7.3, 99.9)
+        ]).decode())
+        self.assertEqual(
+            (stats['avg_flowrate'], stats['avg_pressure'], stats['avg_temperature']), (119.8, 6.3, 110.066666)
+        )
+
+    def test_fallback_parse_keeps_the_schema(self):
+        # Text in a numeric column makes the fast typed parse fail
+        df, invalid = read_equipment_csv(SimpleUploadedFile('f.csv', make_csv([
+            ('P1', 'Pump', 'n/a?', 2, 3), ('P2', 'Valve', 4, 'x', 6)
+        ])))
+        self.assertEqual(invalid.tolist(), [1, 1, 0])
+        self.assertIsInstance(df['Type'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['Flowrate'].dtype, np.float32)
+        self.assertEqual(df['Flowrate'].isna().tolist(), [True, False])
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Missing columns: ['Temperature']"):
+            self.parse("Equipment Name,Type,Flowrate,Pressure\nP1,Pump,1,2\n")
+
+
+class DatasetUploadTests(ApiTestCase):
+    def test_upload_exposes_quality_report(self):
+        response = self.upload(make_csv([('P1', 'Pump', 'inf', 2, 3), ('P2', 'Pump', 4, 5, 6)]))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['avg_flowrate'], 4.0)
+        self.assertEqual(response.data['quality_report']['valid_rows'], 1)
+        self.assertEqual(response.data['quality_report']['columns']['Flowrate']['invalid'], 1)
+
+
+class BaselineTests(ApiTestCase):
+    def test_chan_merge_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        batches = [random_rows(rng, n) + random_rows(rng, n // 2, 'Valve', 'V') for n in (40, 7, 120)]
+        for rows in batches:
+            df, _ = read_equipment_csv(SimpleUploadedFile('b.csv', make_csv(rows)))
+            update_baselines(df)
+
+        all_rows = [row for rows in batches for row in rows]
+        for eq_type in ('Pump', 'Valve'):
+            # Compare against the values as parsed (float32)
+            values = np.array([row[2:] for row in all_rows if row[1] == eq_type], dtype='float32').astype('float64')
+            for i, param in enumerate(('Flowrate', 'Pressure', 'Temperature')):
+                baseline = ParameterBaseline.objects.get(equipment_type=eq_type, parameter=param)
+                self.assertEqual(baseline.count, len(values))
+                self.assertAlmostEqual(baseline.mean, values[:, i].mean(), places=9)
+                self.assertAlmostEqual(baseline.m2 / baseline.count, values[:, i].var(), places=7)
+
+    def test_sketch_quantile_within_accuracy(self):
+        rng = np.random.default_rng(1)
+        values = np.concatenate([rng.lognormal(3, 1, 5000), -rng.lognormal(1, 0.5, 1000), np.zeros(50)])
+        sketch = empty_sketch()
+        # Two batches merge the same way consecutive uploads do
+        sketch_add(sketch, values[:3000])
+        sketch_add(sketch, values[3000:])
+        for q in (0.01, 0.05, 0.25, 0.5, 0.95, 0.99):
+            expected = np.quantile(values, q, method='lower')
+            self.assertLessEqual(abs(sketch_quantile(sketch, q) - expected), SKETCH_ACCURACY * abs(expected))
+
+    def test_empty_sketch_has_no_quantile(self):
+        self.assertIsNone(sketch_quantile(empty_sketch(), 0.5))
+
+    def test_non_finite_values_are_left_out(self):
+        df = pd.DataFrame({
+            'Equipment Name': ['P1', 'P2', 'P3'],
+            'Type': pd.Categorical(['Pump'] * 3),
+            'Flowrate': np.array([1, np.inf, 3], dtype='float32'),
+            'Pressure': np.array([1, 2, -np.inf], dtype='float32'),
+            'Temperature': np.array([1, 2, 3], dtype='float32'),
+        })
+        update_baselines(df)
+        flowrate = ParameterBaseline.objects.get(equipment_type='Pump', parameter='Flowrate')
+        self.assertEqual((flowrate.count, flowrate.mean, flowrate.m2), (2, 2.0, 2.0))
+        self.assertEqual(sum(int(c) for c in flowrate.sketch['pos'].values()), 2)
+        with override_settings(ANOMALY_MIN_COUNT=1, ANOMALY_Z_THRESHOLD=0.5):
+            _, rows = flag_anomalies(df)
+        self.assertNotIn((1, 'Flowrate'), [(row['row'], row['parameter']) for row in rows])
+
+
+@override_settings(ANOMALY_MIN_COUNT=30, ANOMALY_Z_THRESHOLD=3.0)
+class AnomalyEndpointTests(ApiTestCase):
+    def test_flags_rows_far_from_baseline(self):
+        rng = np.random.default_rng(2)
+        self.assertEqual(self.upload(make_csv(random_rows(rng, 200))).status_code, 201)
+
+        rows = random_rows(rng, 20)
+        rows[7] = ('P7', 'Pump', 100.0, 5.0, 180.5)
+        response = self.upload(make_csv(rows))
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('anomalies', response.data)
+
+        response = self.client.get(f"/api/datasets/{response.data['id']}/anomalies/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['threshold'], 3.0)
+        flagged = response.data['rows'][0]
+        self.assertEqual(
+            (flagged['row'], flagged['equipment_name'], flagged['parameter'], flagged['value']),
+            (7, 'P7', 'Temperature', 180.5)
+        )
+        self.assertGreater(flagged['z_score'], 3.0)
+
+    def test_no_flags_without_enough_history(self):
+        rng = np.random.default_rng(3)
+        rows = random_rows(rng, 10)
+        rows[0] = ('P0', 'Pump', 100.0, 5.0, 1000.0)
+        response = self.upload(make_csv(rows))
+        self.assertEqual(self.client.get(f"/api/datasets/{response.data['id']}/anomalies/").data['count'], 0)
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=64)
+class ChunkedUploadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = make_csv(random_rows(np.random.default_rng(4), 10))
+
+    def start(self):
+        response = self.client.post('/api/uploads/', {'filename': 'chunked.csv', 'total_size': len(self.content)})
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def put_chunk(self, session, index, body=None):
+        if body is None:
+            size = session['chunk_size']
+            body = self.content[index * size:(index + 1) * size]
+        return self.client.put(
+            f"/api/uploads/{session['id']}/chunks/{index}/", body, content_type='application/octet-stream'
+        )
+
+    def test_out_of_order_chunks(self):
+        session = self.start()
+        self.assertGreater(session['total_chunks'], 2)
+        for index in reversed(range(session['total_chunks'])):
+            self.assertEqual(self.put_chunk(session, index).status_code, 200)
+        # A repeated chunk is accepted and counted once
+        self.assertEqual(self.put_chunk(session, 0).status_code, 200)
+        self.assertEqual(
+            self.client.get(f"/api/uploads/{session['id']}/").data['received_chunks'],
+            list(range(session['total_chunks']))
+        )
+
+        response = self.client.post(f"/api/uploads/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_count'], 10)
+        dataset = EquipmentDataset.objects.get(pk=response.data['id'])
+        with dataset.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_short_chunk_is_not_recorded(self):
+        session = self.start()
+        self.assertEqual(self.put_chunk(session, 0).status_code, 200)
+        response = self.put_chunk(session, 0, self.content[:10])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(f"/api/uploads/{session['id']}/").data['received_chunks'], [])
+
+    def test_finalize_reports_missing_chunks(self):
+        session = self.start()
+        self.put_chunk(session, 1)
+        response = self.client.post(f"/api/uploads/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 400)
+        expected = [i for i in range(session['total_chunks']) if i != 1]
+        self.assertEqual(response.data['missing_chunks'], expected)
+        self.assertFalse(EquipmentDataset.objects.exists())
+
+    def send_all(self, session):
+        for index in range(session['total_chunks']):
+            self.assertEqual(self.put_chunk(session, index).status_code, 200)
+
+    def test_transient_failure_keeps_the_upload(self):
+        session = self.start()
+        self.send_all(session)
+        for target in ('api.baselines.update_baselines', 'api.views.EquipmentDataset.objects.create'):
+            with mock.patch(target, side_effect=OperationalError('database is locked')):
+                response = self.client.post(f"/api/uploads/{session['id']}/finalize/")
+            self.assertEqual(response.status_code, 503, target)
+            self.assertTrue(UploadSession.objects.filter(pk=session['id']).exists())
+            self.assertFalse(EquipmentDataset.objects.exists())
+            with open(partial_path(UploadSession.objects.get(pk=session['id'])), 'rb') as f:
+                self.assertEqual(f.read(), self.content)
+
+        response = self.client.post(f"/api/uploads/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 201)
+
+    def test_rejected_csv_ends_the_session(self):
+        self.content = b'Equipment Name,Type\nP1,Pump\n'
+        session = self.start()
+        self.send_all(session)
+        path = partial_path(UploadSession.objects.get(pk=session['id']))
+        response = self.client.post(f"/api/uploads/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_chunk_index_out_of_range(self):
+        session = self.start()
+        self.assertEqual(self.put_chunk(session, session['total_chunks'], b'x').status_code, 400)
+
+    @override_settings(UPLOAD_MAX_SIZE=100)
+    def test_total_size_is_capped(self):
+        response = self.client.post('/api/uploads/', {'filename': 'big.csv', 'total_size': 101})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sessions_are_private(self):
+        session = self.start()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('bob'))
+        self.assertEqual(other.get(f"/api/uploads/{session['id']}/").status_code, 404)
+
+
+class TokenCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def start_upload(self):
+        return self.client.post('/api/uploads/', {'filename': 'x.csv', 'total_size': 0})
+
+    def test_cached_token_authenticates(self):
+        self.assertEqual(self.start_upload().status_code, 201)
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        # Only the baselines query itself, no token or user lookup
+        with self.assertNumQueries(1):
+            self.client.get('/api/baselines/')
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(self.start_upload().status_code, 201)
+        self.token.delete()
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertEqual(self.start_upload().status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.start_upload().status_code, 201)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertEqual(self.start_upload().status_code, 401)
+
+
+@override_settings(STORAGE_COMPRESSION='gzip', RAW_RETENTION_DAYS=None, RAW_QUOTA_BYTES=None, RAW_ARCHIVE_DIR=None)
+class StorageTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = make_csv(random_rows(np.random.default_rng(5), 100))
+
+    def create(self):
+        # Compression normally runs in a thread after commit, which TestCase never does
+        response = self.upload(self.content)
+        self.assertEqual(response.status_code, 201)
+        return EquipmentDataset.objects.get(pk=response.data['id'])
+
+    def test_compress_dataset(self):
+        dataset = self.create()
+        plain_path = dataset.file.path
+        compress_dataset(dataset.pk)
+        dataset.refresh_from_db()
+        self.assertTrue(dataset.file.name.endswith('.csv.gz'))
+        self.assertEqual(dataset.raw_size, len(self.content))
+        self.assertLess(stored_size(dataset), len(self.content))
+        self.assertFalse(os.path.exists(plain_path))
+        with open_raw(dataset) as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_export_and_raw_data_read_compressed_files(self):
+        dataset = self.create()
+        compress_dataset(dataset.pk)
+        response = self.client.get(f"/api/datasets/{dataset.pk}/export/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        response = self.client.get(f"/api/datasets/{dataset.pk}/raw_data/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 50)
+
+    def test_quota_evicts_oldest_first(self):
+        datasets = [self.create() for _ in range(3)]
+        for dataset in datasets:
+            compress_dataset(dataset.pk)
+            dataset.refresh_from_db()
+        newest_size = stored_size(datasets[-1])
+
+        with override_settings(RAW_QUOTA_BYTES=newest_size):
+            self.assertEqual(apply_policy(dry_run=True)['evicted'], 2)
+            self.assertEqual(EquipmentDataset.objects.exclude(file='').count(), 3)
+            summary = apply_policy()
+        self.assertEqual(summary['evicted'], 2)
+        self.assertEqual(summary['stored_bytes'], newest_size)
+        kept = EquipmentDataset.objects.exclude(file='').values_list('pk', flat=True)
+        self.assertEqual(list(kept), [datasets[-1].pk])
+
+    def test_retention_evicts_old_files_and_compresses_the_rest(self):
+        old, recent = self.create(), self.create()
+        EquipmentDataset.objects.filter(pk=old.pk).update(uploaded_at=timezone.now() - timedelta(days=40))
+        with override_settings(RAW_RETENTION_DAYS=30):
+            summary = apply_policy()
+        self.assertEqual((summary['compressed'], summary['evicted']), (2, 1))
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertFalse(old.file)
+        self.assertTrue(recent.file.name.endswith('.gz'))
+        # Stats survive eviction
+        self.assertEqual(old.total_count, 100)
+
+    def test_archive_dir_keeps_the_file(self):
+        dataset = self.create()
+        archive = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive, ignore_errors=True)
+        with override_settings(RAW_ARCHIVE_DIR=archive):
+            evict_raw(dataset)
+        self.assertEqual(len(os.listdir(archive)), 1)
+        data = self.client.get(f"/api/datasets/{dataset.pk}/").data
+        self.assertTrue(data['archived'])
+        self.assertNotIn('archived_to', data)
+
+    def test_evicted_dataset_answers_410(self):
+        dataset = self.create()
+        evict_raw(dataset)
+        for url in ('raw_data/', 'export/', 'chart/?kind=scatter'):
+            response = self.client.get(f"/api/datasets/{dataset.pk}/{url}")
+            self.assertEqual(response.status_code, 410, url)
+        # The distribution chart only needs the stored stats
+        self.assertEqual(self.client.get(f"/api/datasets/{dataset.pk}/chart/").status_code, 200)
+
+
+class ChartTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        response = self.upload(make_csv(random_rows(np.random.default_rng(6), 20) + random_rows(
+            np.random.default_rng(7), 10, 'Valve', 'V'
+        )))
+        self.dataset_id = response.data['id']
+
+    def get_chart(self, query=''):
+        return self.client.get(f"/api/datasets/{self.dataset_id}/chart/{query}")
+
+    def cached_files(self):
+        return sorted(os.listdir(cache_dir())) if os.path.isdir(cache_dir()) else []
+
+    def test_formats(self):
+        response = self.get_chart('?fmt=png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'\x89PNG'))
+        response = self.get_chart('?kind=scatter&fmt=svg&width=300&height=200')
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'<svg', b''.join(response.streaming_content))
+        self.assertIn(f"{self.dataset_id}_scatter_300x200.svg", self.cached_files())
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get_chart('?kind=pie').status_code, 400)
+        self.assertEqual(self.get_chart('?fmt=gif').status_code, 400)
+        self.assertEqual(self.get_chart('?width=wide').status_code, 400)
+
+    def test_cache_hit_skips_render(self):
+        with mock.patch('api.charts.render_chart', wraps=render_chart) as render:
+            first = b''.join(self.get_chart().streaming_content)
+            second = b''.join(self.get_chart().streaming_content)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_eviction_keeps_the_new_chart(self):
+        with override_settings(CHART_CACHE_MAX_BYTES=1):
+            response = self.get_chart('?width=400')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(b''.join(response.streaming_content))
+            self.assertEqual(self.cached_files(), [f"{self.dataset_id}_distribution_400x400.png"])
+            self.get_chart('?width=500')
+            self.assertEqual(self.cached_files(), [f"{self.dataset_id}_distribution_500x400.png"])
+
+    def test_evict_charts_honours_keep(self):
+        self.get_chart('?width=400')
+        self.get_chart('?width=500')
+        keep = os.path.join(cache_dir(), f"{self.dataset_id}_distribution_400x400.png")
+        with override_settings(CHART_CACHE_MAX_BYTES=0):
+            evict_charts(keep=keep)
+        self.assertEqual(self.cached_files(), [os.path.basename(keep)])
+
+    def test_delete_clears_charts(self):
+        self.get_chart()
+        self.assertTrue(self.cached_files())
+        self.assertEqual(self.client.delete(f"/api/datasets/{self.dataset_id}/").status_code, 204)
+        self.assertEqual(self.cached_files(), [])
+
+    def test_pdf_report_uses_cached_charts(self):
+        with mock.patch('api.charts.render_chart', wraps=render_chart) as render:
+            response = self.client.get(f"/api/datasets/{self.dataset_id}/generate_pdf/")
+            self.client.get(f"/api/datasets/{self.dataset_id}/generate_pdf/")
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertEqual(render.call_count, 2)
+
+    def test_pdf_report_without_raw_data(self):
+        evict_raw(EquipmentDataset.objects.get(pk=self.dataset_id))
+        with mock.patch('api.charts.render_chart', wraps=render_chart) as render:
+            response = self.client.get(f"/api/datasets/{self.dataset_id}/generate_pdf/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c.args[1] for c in render.call_args_list], ['distribution', 'scatter'])
+        self.assertEqual(self.cached_files(), [f"{self.dataset_id}_distribution_800x400.png"])
+
+    def test_pdf_report_surfaces_render_errors(self):
+        with mock.patch('api.charts.render_chart', side_effect=RuntimeError('broken chart')):
+            with self.assertRaisesMessage(RuntimeError, 'broken chart'):
+                self.client.get(f"/api/datasets/{self.dataset_id}/generate_pdf/")
+
+
+class EventStreamTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.user)
+        self.other = User.objects.create_user('bob')
+        token_cache.clear()
+
+    async def read_until(self, stream, event):
+        """Collect SSE chunks until one carries the given event."""
+        chunks = []
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), 5)
+            chunks.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+            if f"event: {event}\n" in chunks[-1]:
+                return ''.join(chunks)
+
+    async def open_stream(self, last_id, token=None):
+        headers = {'Last-Event-ID': str(last_id)}
+        if token:
+            headers['Authorization'] = f"Token {token}"
+        response = await self.async_client.get('/api/events/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response.streaming_content.__aiter__()
+
+    def publish_progress(self, user, filename):
+        publish('ingest-progress', {'filename': filename}, user_id=user.pk)
+
+    def test_wsgi_is_refused(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 503)
+
+    async def test_bad_token_is_rejected(self):
+        response = await self.async_client.get('/api/events/', headers={'Authorization': 'Token nope'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_progress_only_reaches_its_owner(self):
+        last_id = broker._next_id - 1
+        self.publish_progress(self.user, 'alice.csv')
+        self.publish_progress(self.other, 'bob.csv')
+        publish('dataset-created', {'id': 1})
+
+        # Replayed history after Last-Event-ID
+        owner = await self.open_stream(last_id, self.token.key)
+        replayed = await self.read_until(owner, 'dataset-created')
+        self.assertIn('alice.csv', replayed)
+        self.assertNotIn('bob.csv', replayed)
+
+        anonymous = await self.open_stream(last_id)
+        replayed = await self.read_until(anonymous, 'dataset-created')
+        self.assertNotIn('ingest-progress', replayed)
+
+        # Live events go through the same filter
+        self.publish_progress(self.other, 'bob-2.csv')
+        self.publish_progress(self.user, 'alice-2.csv')
+        live = await self.read_until(owner, 'ingest-progress')
+        self.assertIn('alice-2.csv', live)
+        self.assertNotIn('bob-2.csv', live)
+        await owner.aclose()
+        await anonymous.aclose()
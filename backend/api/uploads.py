@@ -0,0 +1,105 @@
+import os
+import glob
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from .models import UploadSession
+
+# Chunks are written in place at index * chunk_size, so nothing is reassembled on finalize
+PARTIAL_DIR = 'uploads/partial'
+READ_BLOCK = 64 * 1024
+
+
+def partial_path(session):
+    return os.path.join(settings.MEDIA_ROOT, PARTIAL_DIR, f"{session.id}.part")
+
+
+def create_partial(session):
+    """Pre-size the partial file so chunks can land in any order."""
+    path = partial_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.truncate(session.total_size)
+
+
+def chunk_length(session, index):
+    offset = index * session.chunk_size
+    return max(0, min(session.chunk_size, session.total_size - offset))
+
+
+def write_chunk(session, index, stream):
+    """
+    Stream one chunk from the request body into its slot of the partial file.
+    Returns the number of bytes written.
+    """
+    expected = chunk_length(session, index)
+    written = 0
+    with open(partial_path(session), 'r+b') as f:
+        f.seek(index * session.chunk_size)
+        while written < expected:
+            block = stream.read(min(READ_BLOCK, expected - written))
+            if not block:
+                break
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def commit_partial(session):
+    """
+    Move the finished partial file under uploads/ with a rename (no copy).
+    Returns the storage name to assign to EquipmentDataset.file.
+    """
+    name = default_storage.get_available_name(f"uploads/{os.path.basename(session.filename)}")
+    os.replace(partial_path(session), os.path.join(settings.MEDIA_ROOT, name))
+    return name
+
+
+def restore_partial(session, name):
+    """Undo commit_partial, so finalize can be retried after a failed save."""
+    os.replace(os.path.join(settings.MEDIA_ROOT, name), partial_path(session))
+
+
+def discard_partial(session):
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def expire_sessions(dry_run=False):
+    """
+    Drop upload sessions older than UPLOAD_SESSION_MAX_AGE_HOURS with their partial
+    files, plus old partial files whose session is already gone.
+    Returns (sessions expired, partial files removed).
+    """
+    max_age = timedelta(hours=settings.UPLOAD_SESSION_MAX_AGE_HOURS)
+    expired = {
+        str(pk) for pk in UploadSession.objects.filter(
+            created_at__lt=timezone.now() - max_age
+        ).values_list('pk', flat=True)
+    }
+    live = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)} - expired
+
+    # A new session's row exists before its file, so an orphan only counts once it is old too
+    cutoff = time.time() - max_age.total_seconds()
+    stale = []
+    for path in glob.glob(os.path.join(settings.MEDIA_ROOT, PARTIAL_DIR, '*.part')):
+        session_id = os.path.basename(path)[:-len('.part')]
+        try:
+            old = os.path.getmtime(path) < cutoff
+        except FileNotFoundError:
+            continue
+        if session_id in expired or (session_id not in live and old):
+            stale.append(path)
+
+    if not dry_run:
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        UploadSession.objects.filter(pk__in=expired).delete()
+    return len(expired), len(stale)
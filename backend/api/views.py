@@ -1,12 +1,25 @@
 import pandas as pd
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, mixins, status, permissions, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.http import HttpResponse
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from django.conf import settings
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
-from .models import EquipmentDataset
-from .serializers import EquipmentDatasetSerializer
+from reportlab.lib.utils import ImageReader
+from .authentication import token_expired
+from .models import EquipmentDataset, UploadSession, UploadChunk, ParameterBaseline
+from .serializers import EquipmentDatasetSerializer, UploadSessionSerializer, ParameterBaselineSerializer
+from .ingest import ingest_upload, InvalidCSV
+from .events import publish
+from .charts import CHART_KINDS, CHART_FORMATS, MIN_SIZE, MAX_SIZE, get_chart, clear_charts
+from .storage import open_raw, RawDataUnavailable, COPY_BLOCK
+from .uploads import (
+    create_partial, chunk_length, write_chunk, partial_path, commit_partial, restore_partial,
+    discard_partial
+)
 
 class EquipmentDatasetViewSet(viewsets.ModelViewSet):
     queryset = EquipmentDataset.objects.all().order_by('-uploaded_at')
@@ -15,40 +28,62 @@ class EquipmentDatasetViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         file_obj = self.request.data.get('file')
+        uploader = self.request.user if self.request.user.is_authenticated else None
         try:
-            df = pd.read_csv(file_obj)
-            
-            # 1. Validate exact columns from your CSV
-            required_cols = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-            missing = [col for col in required_cols if col not in df.columns]
-            if missing:
-                raise serializers.ValidationError(f"Missing columns: {missing}")
-
-            # 2. Calculate Stats based on your data ranges
-            stats = {
-                'total_count': len(df),
-                'avg_flowrate': df['Flowrate'].mean(),
-                'avg_pressure': df['Pressure'].mean(),
-                'avg_temperature': df['Temperature'].mean(),
-                'type_distribution': df['Type'].value_counts().to_dict(),
-                'uploader': self.request.user if self.request.user.is_authenticated else None
-            }
-            serializer.save(**stats)
-            
+            ingest_upload(
+                file_obj,
+                lambda stats: serializer.save(uploader=uploader, **stats),
+                lambda dataset: serializer.data
+            )
         except Exception as e:
             raise serializers.ValidationError(f"Error processing CSV: {str(e)}")
 
+    def perform_destroy(self, instance):
+        clear_charts(instance.id)
+        instance.delete()
+
     @action(detail=True, methods=['get'])
     def raw_data(self, request, pk=None):
         dataset = self.get_object()
         try:
-            df = pd.read_csv(dataset.file.path)
+            # Only the first 50 rows are decompressed and parsed
+            with open_raw(dataset) as f:
+                df = pd.read_csv(f, nrows=50)
             # Return first 50 rows, handling NaNs
-            data = df.head(50).where(pd.notnull(df), None).to_dict(orient='records') 
+            data = df.where(pd.notnull(df), None).to_dict(orient='records') 
             return Response(data)
+        except RawDataUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_410_GONE)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Download the original CSV, decompressed as it streams out."""
+        dataset = self.get_object()
+        try:
+            f = open_raw(dataset)
+        except RawDataUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+
+        def stream():
+            with f:
+                yield from iter(lambda: f.read(COPY_BLOCK), b'')
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="dataset_{dataset.id}.csv"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def anomalies(self, request, pk=None):
+        """Rows flagged at upload time as far off their type's fleet baseline."""
+        dataset = self.get_object()
+        return Response({
+            "count": dataset.anomaly_count,
+            "threshold": settings.ANOMALY_Z_THRESHOLD,
+            "rows": dataset.anomalies,
+        })
+
     @action(detail=True, methods=['get'])
     def generate_pdf(self, request, pk=None):
         dataset = self.get_object()
@@ -76,6 +111,184 @@ class EquipmentDatasetViewSet(viewsets.ModelViewSet):
             p.drawString(120, y, f"- {eq_type}: {count}")
             y -= 15
 
+        # Charts come from the same cache as the chart endpoint
+        for kind in CHART_KINDS:
+            try:
+                chart = get_chart(dataset, kind, 800, 400)
+            except RawDataUnavailable:
+                # Row-level charts need the raw file, evicted ones are left out
+                continue
+            if y < 250:
+                p.showPage()
+                y = 750
+            with chart:
+                p.drawImage(ImageReader(chart), 100, y - 215, width=400, height=200)
+            y -= 230
+
         p.showPage()
         p.save()
-        return response
\ No newline at end of file
+        return response
+
+    @action(detail=True, methods=['get'])
+    def chart(self, request, pk=None):
+        """Server-rendered chart: ?kind=distribution|scatter&width=800&height=400&fmt=png|svg"""
+        dataset = self.get_object()
+        kind = request.query_params.get('kind', 'distribution')
+        fmt = request.query_params.get('fmt', 'png')
+        if kind not in CHART_KINDS or fmt not in CHART_FORMATS:
+            return Response(
+                {"error": f"kind must be one of {list(CHART_KINDS)}, fmt one of {list(CHART_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            width = int(request.query_params.get('width', 800))
+            height = int(request.query_params.get('height', 400))
+        except ValueError:
+            return Response({"error": "width and height must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        width = max(MIN_SIZE, min(width, MAX_SIZE))
+        height = max(MIN_SIZE, min(height, MAX_SIZE))
+
+        try:
+            chart = get_chart(dataset, kind, width, height, fmt)
+        except RawDataUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return FileResponse(chart, content_type=CHART_FORMATS[fmt])
+
+
+class ParameterBaselineViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ParameterBaseline.objects.all().order_by('equipment_type', 'parameter')
+    serializer_class = ParameterBaselineSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads: POST to start, PUT each chunk by index,
+    GET to see which chunks arrived, then POST finalize to ingest.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(uploader=self.request.user)
+
+    def perform_create(self, serializer):
+        try:
+            requested = int(self.request.data.get('chunk_size') or settings.UPLOAD_CHUNK_SIZE)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("chunk_size must be an integer")
+        chunk_size = max(1, min(requested, settings.UPLOAD_CHUNK_SIZE))
+        session = serializer.save(uploader=self.request.user, chunk_size=chunk_size)
+        create_partial(session)
+
+    def perform_destroy(self, instance):
+        discard_partial(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        session = self.get_object()
+        index = int(index)
+        if index >= session.total_chunks:
+            return Response(
+                {"error": f"Chunk index out of range (0-{session.total_chunks - 1})"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Read the raw body as a stream, chunks never pass through the parsers
+        expected = chunk_length(session, index)
+        written = write_chunk(session, index, request.stream) if request.stream else 0
+        if written != expected:
+            # The slot now holds partial bytes, so it has to be sent again
+            UploadChunk.objects.filter(session=session, index=index).delete()
+            return Response(
+                {"error": f"Incomplete chunk: got {written} of {expected} bytes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        UploadChunk.objects.get_or_create(session=session, index=index)
+        self.publish_progress(session, 'uploading', received=session.chunks.count())
+        return Response({"index": index, "size": written})
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        received = set(session.chunks.values_list('index', flat=True))
+        missing = [i for i in range(session.total_chunks) if i not in received]
+        if missing:
+            return Response(
+                {"error": "Upload incomplete", "missing_chunks": missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def save(stats):
+            # Rename the partial file into place only once it has parsed
+            name = commit_partial(session)
+            try:
+                return EquipmentDataset.objects.create(file=name, uploader=request.user, **stats)
+            except Exception:
+                restore_partial(session, name)
+                raise
+
+        # Ingest straight from the partial file
+        self.publish_progress(session, 'processing')
+        try:
+            data = ingest_upload(
+                partial_path(session), save,
+                lambda dataset: EquipmentDatasetSerializer(dataset, context=self.get_serializer_context()).data,
+                discard=lambda dataset: restore_partial(session, dataset.file.name)
+            )
+        except InvalidCSV as e:
+            # Only a rejected file ends the session, re-sending it would not help
+            self.publish_progress(session, 'failed', error=str(e))
+            self.perform_destroy(session)
+            return Response(
+                {"error": f"Error processing CSV: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            # Anything else (locked database, full disk) keeps the assembled file for a retry
+            self.publish_progress(session, 'failed', error=str(e), retry=True)
+            return Response(
+                {"error": f"Could not store the upload, finalize again to retry: {str(e)}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        self.publish_progress(session, 'done', dataset=data['id'])
+        session.delete()
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def publish_progress(session, stage, **extra):
+        publish('ingest-progress', {
+            'upload': str(session.id),
+            'filename': session.filename,
+            'stage': stage,
+            'total_chunks': session.total_chunks,
+            **extra,
+        }, user_id=session.uploader_id)
+
+
+class ObtainExpiringAuthToken(ObtainAuthToken):
+    """
+    Token endpoint that also accepts Basic auth credentials (the one view where
+    BASIC_AUTH_TOKEN_ONLY still allows them) and replaces expired tokens.
+    """
+    allow_basic_auth = True
+
+    def post(self, request, *args, **kwargs):
+        if request.user and request.user.is_authenticated:
+            user = request.user
+        else:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            user = serializer.validated_data['user']
+
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
+        return Response({'token': token.key})
@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve through this entry point (e.g. ``uvicorn config.asgi:application``) for
+the /api/events/ server-sent event stream; WSGI workers can't hold it open.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -138,13 +138,44 @@ CORS_ALLOW_ALL_ORIGINS = True # Allow your Vercel (frontend) React to talk to Dj
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumable uploads: size of each chunk the client sends (clients may ask for less)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Largest file an upload session may declare, and how long an unfinished session
+# (with its pre-sized partial file) is kept before apply_storage_policy removes it
+UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+
+# Rendered chart images are cached under MEDIA_ROOT/charts, evicted LRU beyond this size
+CHART_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+# A row is flagged when |z| against its type's baseline exceeds this,
+# once the baseline has seen at least ANOMALY_MIN_COUNT values
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_MIN_COUNT = 30
+
+# Uploaded CSVs are compressed after ingest: 'gzip', 'zstd' (needs zstandard) or None
+STORAGE_COMPRESSION = 'gzip'
+# Retention policy applied by `manage.py apply_storage_policy`; None disables each rule.
+# Evicted raw files are moved to RAW_ARCHIVE_DIR if set, otherwise deleted; stats are kept.
+RAW_RETENTION_DAYS = None
+RAW_QUOTA_BYTES = None
+RAW_ARCHIVE_DIR = None
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',  # For React
-        'rest_framework.authentication.BasicAuthentication',  # For Desktop App / Testing
+        'api.authentication.CachedTokenAuthentication',  # For React / Desktop App
+        'api.authentication.TokenIssuanceBasicAuthentication',  # For Testing
         'rest_framework.authentication.SessionAuthentication', # For Browserable API
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ]
-}
\ No newline at end of file
+}
+
+# Token lookups are cached in-process for TOKEN_CACHE_TTL seconds (at most TOKEN_CACHE_SIZE tokens)
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_SIZE = 1024
+# Tokens older than this many seconds are rejected and re-issued on login; None never expires
+TOKEN_EXPIRE_AFTER = None
+# Only accept Basic auth on the token endpoint, so other requests never pay for a password hash
+BASIC_AUTH_TOKEN_ONLY = False
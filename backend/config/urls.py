@@ -17,16 +17,21 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from api.views import EquipmentDatasetViewSet
+from api.views import (
+    EquipmentDatasetViewSet, UploadSessionViewSet, ParameterBaselineViewSet, ObtainExpiringAuthToken
+)
+from api.events import dataset_events
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework.authtoken import views
 
 router = DefaultRouter()
 router.register(r'datasets', EquipmentDatasetViewSet)
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
+router.register(r'baselines', ParameterBaselineViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/events/', dataset_events),
     path('api/', include(router.urls)),
-    path('api/api-token-auth/', views.obtain_auth_token),
+    path('api/api-token-auth/', ObtainExpiringAuthToken.as_view()),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,18 +1,292 @@
+import os
 import sys
+import json
+import time
+import base64
+import tempfile
+import webbrowser
 import requests
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QLabel, QPushButton, QFileDialog,
     QTableWidget, QTableWidgetItem, QLineEdit,
-    QListWidget, QMessageBox, QGroupBox, QHeaderView, QStatusBar
+    QListWidget, QMessageBox, QGroupBox, QHeaderView, QStatusBar,
+    QProgressDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 # Base API URL, same as the React frontend
 API_URL = 'https://chemical-backend-nghd.onrender.com/api' # When using locally 'http://127.0.0.1:8000/api';
 
+# Chunked uploads: parallel chunk requests, retries per chunk, and where
+# unfinished upload sessions are remembered so they can resume after a restart
+UPLOAD_WORKERS = 4
+CHUNK_RETRIES = 3
+UPLOAD_STATE_FILE = os.path.join(os.path.expanduser("~"), ".chemical_visualizer_uploads.json")
+
+
+def load_upload_state():
+    try:
+        with open(UPLOAD_STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_upload_state(state):
+    try:
+        with open(UPLOAD_STATE_FILE, "w") as f:
+            json.dump(state, f)
+    except OSError:
+        pass
+
+
+# Client-side cache for summaries, row pages and PDFs, bounded by total bytes.
+# Set CACHE_FILE to None to keep it in memory only for the current session.
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".chemical_visualizer_cache.json")
+PREFETCH_WORKERS = 4
+
+
+def cache_key(kind, ds_id=""):
+    """Cache key scoped to API_URL, so local and hosted backends never share entries."""
+    return f"{API_URL}|{kind}:{ds_id}"
+
+
+class ByteLRUCache:
+    """Thread-safe LRU of key -> bytes that evicts least recently used entries past max_bytes."""
+
+    def __init__(self, max_bytes, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            if len(value) > self.max_bytes:
+                return
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def keys(self, prefix=""):
+        with self.lock:
+            return [k for k in self.entries if k.startswith(prefix)]
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path) as f:
+                entries = [(key, base64.b64decode(value)) for key, value in json.load(f)]
+        except Exception:
+            # Missing, corrupt or from another version: start empty
+            return
+        # Re-insert oldest first so the byte bound still holds if it was lowered
+        for key, value in entries:
+            self.put(key, value)
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            entries = [[key, base64.b64encode(value).decode("ascii")] for key, value in self.entries.items()]
+        try:
+            with open(self.path, "w") as f:
+                json.dump(entries, f)
+        except OSError:
+            pass
+
+
+# ----------------- SERVER EVENTS ----------------- #
+
+class DatasetEvents(QObject):
+    """
+    Listens to the backend's server-sent event stream on a daemon thread.
+    Events are re-emitted through a Qt signal so slots run on the UI thread.
+    """
+    received = pyqtSignal(str, dict)
+
+    def __init__(self, headers):
+        super().__init__()
+        self.headers = headers
+        self.stopped = False
+
+    def start(self):
+        threading.Thread(target=self.listen, daemon=True).start()
+
+    def stop(self):
+        self.stopped = True
+
+    def listen(self):
+        last_id = None
+        backoff = 1
+        while not self.stopped:
+            headers = dict(self.headers)
+            if last_id:
+                # Server replays anything we missed while disconnected
+                headers["Last-Event-ID"] = last_id
+            try:
+                with requests.get(
+                    f"{API_URL}/events/", headers=headers, stream=True, timeout=(10, 60)
+                ) as r:
+                    if r.status_code in (401, 503):
+                        # Bad token, or a server without streaming: "Refresh List" still works
+                        return
+                    if r.status_code != 200:
+                        raise requests.HTTPError(f"Status {r.status_code}")
+                    backoff = 1
+                    event, data = None, []
+                    for line in r.iter_lines(decode_unicode=True):
+                        if self.stopped:
+                            return
+                        if not line:
+                            if event and data:
+                                self.received.emit(event, json.loads("\n".join(data)))
+                            event, data = None, []
+                        elif line.startswith("id:"):
+                            last_id = line[3:].strip()
+                        elif line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+            except (requests.RequestException, ValueError):
+                pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+# ----------------- CHUNKED UPLOADS ----------------- #
+
+class ChunkUploader(QObject):
+    """
+    Sends one file through the resumable upload API on a daemon thread,
+    several chunks at a time. Progress and the outcome come back as Qt signals
+    so the window stays responsive and slots run on the UI thread.
+    """
+    progress = pyqtSignal(int, int)  # chunks done, total chunks
+    finished = pyqtSignal(object)    # finalize response, or None if cancelled
+    failed = pyqtSignal(str)
+
+    def __init__(self, fname, headers):
+        super().__init__()
+        self.fname = fname
+        self.headers = headers
+        self.cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            self.finished.emit(self.upload())
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def upload(self):
+        """Returns the finalize response, or None if the upload was cancelled."""
+        fname = self.fname
+        stat = os.stat(fname)
+        key = f"{os.path.abspath(fname)}|{stat.st_size}|{int(stat.st_mtime)}"
+        state = load_upload_state()
+
+        # Resume a previous session for this exact file if the server still has it
+        session = None
+        if key in state:
+            r = requests.get(f"{API_URL}/uploads/{state[key]}/", headers=self.headers, timeout=30)
+            if r.status_code == 200:
+                session = r.json()
+        if session is None:
+            r = requests.post(
+                f"{API_URL}/uploads/",
+                json={"filename": os.path.basename(fname), "total_size": stat.st_size},
+                headers=self.headers, timeout=30
+            )
+            if r.status_code != 201:
+                return r
+            session = r.json()
+            state[key] = session["id"]
+            save_upload_state(state)
+
+        total = session["total_chunks"]
+        pending = [i for i in range(total) if i not in set(session["received_chunks"])]
+        done = total - len(pending)
+        self.progress.emit(done, total)
+
+        pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+        try:
+            futures = [pool.submit(self.send_chunk, session, index) for index in pending]
+            for future in as_completed(futures):
+                if self.cancelled.is_set():
+                    return None
+                future.result()
+                done += 1
+                self.progress.emit(done, total)
+        finally:
+            # Don't wait for chunks still in flight, re-sending one is harmless
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self.cancelled.is_set():
+            return None
+
+        r = requests.post(
+            f"{API_URL}/uploads/{session['id']}/finalize/", headers=self.headers
+        )
+        # Keep the session while the server still waits for chunks, or couldn't
+        # store the finished file (503) and finalize can simply be retried
+        if r.status_code != 503 and "missing_chunks" not in r.text:
+            state.pop(key, None)
+            save_upload_state(state)
+        return r
+
+    def send_chunk(self, session, index):
+        """Read one chunk from disk and PUT it, retrying transient failures."""
+        chunk_size = session["chunk_size"]
+        with open(self.fname, "rb") as f:
+            f.seek(index * chunk_size)
+            body = f.read(chunk_size)
+
+        headers = dict(self.headers)
+        headers["Content-Type"] = "application/octet-stream"
+        for attempt in range(CHUNK_RETRIES):
+            if self.cancelled.is_set():
+                return
+            try:
+                r = requests.put(
+                    f"{API_URL}/uploads/{session['id']}/chunks/{index}/",
+                    data=body, headers=headers, timeout=60
+                )
+                if r.status_code == 200:
+                    return
+                error = f"Chunk {index} rejected: {r.text}"
+            except requests.RequestException as e:
+                error = f"Chunk {index} failed: {e}"
+            # Wakes up early on cancel
+            self.cancelled.wait(2 ** attempt)
+        raise RuntimeError(error)
+
 
 # ----------------- LOGIN WINDOW ----------------- #
 
@@ -93,6 +367,12 @@ class MainWindow(QMainWindow):
 
         # This will store list endpoint data like React does
         self.dataset_cache = {}
+        # Raw response bytes (summaries, row pages, PDFs), kept across refreshes
+        self.cache = ByteLRUCache(CACHE_MAX_BYTES, CACHE_FILE)
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.uploader = None
 
         # Main layout for the whole window
         central_widget = QWidget()
@@ -179,6 +459,11 @@ class MainWindow(QMainWindow):
         # Load history and auto-select latest dataset like React
         self.load_history(select_latest=True)
 
+        # New uploads (ours or anyone's) are pushed by the server, no polling needed
+        self.events = DatasetEvents(self._headers())
+        self.events.received.connect(self.on_server_event)
+        self.events.start()
+
     # ------------- Helper methods ------------- #
 
     def create_stat_label(self, title):
@@ -203,10 +488,62 @@ class MainWindow(QMainWindow):
             headers["Authorization"] = f"Token {self.token}"
         return headers
 
+    # ------------- Cached fetching ------------- #
+
+    def download(self, key, url):
+        """GET url and store the body in the byte cache. Safe to call from worker threads."""
+        r = requests.get(url, headers=self._headers(), timeout=30)
+        if r.status_code != 200:
+            raise RuntimeError(f"Status {r.status_code}: {r.text}")
+        self.cache.put(key, r.content)
+        return r.content
+
+    def fetch_cached(self, key, url):
+        """Return cached bytes, join a prefetch already in flight, or download now."""
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass
+        return self.download(key, url)
+
+    def prefetch(self, key, url):
+        """Download in the background unless already cached or in flight."""
+        with self.inflight_lock:
+            if key in self.inflight or self.cache.get(key) is not None:
+                return
+            future = self.prefetch_pool.submit(self.download, key, url)
+            self.inflight[key] = future
+        future.add_done_callback(lambda f: self.forget_inflight(key))
+
+    def forget_inflight(self, key):
+        with self.inflight_lock:
+            self.inflight.pop(key, None)
+
+    def remember_summary(self, item):
+        """Keep a list summary both for this session and in the byte cache."""
+        ds_id = str(item['id'])
+        self.dataset_cache[ds_id] = item
+        self.cache.put(cache_key("summary", ds_id), json.dumps(item).encode())
+
+    def show_cached_history(self):
+        """Fill the history list from cached summaries when the backend is unreachable."""
+        items = [json.loads(self.cache.get(key)) for key in self.cache.keys(cache_key("summary"))]
+        items = sorted(items, key=lambda x: x.get('uploaded_at', ''), reverse=True)[:5]
+        for item in items:
+            self.dataset_cache[str(item['id'])] = item
+            self.list_history.addItem(f"ID {item['id']} | {item['uploaded_at'][:16]}")
+        return bool(items)
+
     # ------------- API-related actions ------------- #
 
     def upload_csv(self):
-        """Open file dialog, upload CSV to backend and refresh list."""
+        """Open file dialog and upload the CSV in chunks on a background thread."""
         fname, _ = QFileDialog.getOpenFileName(
             self, 'Open CSV', '.', "CSV Files (*.csv)"
         )
@@ -214,24 +551,63 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Upload cancelled.")
             return
 
-        try:
-            files = {'file': open(fname, 'rb')}
-            r = requests.post(
-                f"{API_URL}/datasets/",
-                files=files,
-                headers=self._headers()
+        self.btn_upload.setEnabled(False)
+        self.statusBar().showMessage(f"Uploading {os.path.basename(fname)}...")
+        self.upload_progress = QProgressDialog(
+            f"Uploading {os.path.basename(fname)}...", "Cancel", 0, 0, self
+        )
+        self.upload_progress.setWindowModality(Qt.WindowModal)
+        self.upload_progress.setMinimumDuration(0)
+        self.upload_progress.setAutoReset(False)
+        self.upload_progress.setAutoClose(False)
+
+        self.uploader = ChunkUploader(fname, self._headers())
+        self.uploader.progress.connect(self.on_upload_progress)
+        self.uploader.finished.connect(self.on_upload_finished)
+        self.uploader.failed.connect(self.on_upload_failed)
+        self.upload_progress.canceled.connect(self.uploader.cancel)
+        self.uploader.start()
+
+    def on_upload_progress(self, done, total):
+        self.upload_progress.setMaximum(total)
+        self.upload_progress.setValue(done)
+        if done == total:
+            self.upload_progress.setLabelText("Processing uploaded file...")
+            self.statusBar().showMessage("Processing uploaded file...")
+
+    def end_upload(self):
+        self.upload_progress.canceled.disconnect(self.uploader.cancel)
+        self.upload_progress.close()
+        self.btn_upload.setEnabled(True)
+
+    def on_upload_finished(self, r):
+        self.end_upload()
+        if r is None:
+            self.statusBar().showMessage(
+                "Upload paused. Upload the same file again to resume."
             )
-            if r.status_code == 201:
-                QMessageBox.information(self, "Success", "File Uploaded Successfully")
-                self.statusBar().showMessage("Upload successful. Refreshing list...")
-                # After upload, reload history and automatically select the newest dataset
-                self.load_history(select_latest=True)
-            else:
-                QMessageBox.critical(self, "Error", f"Upload failed: {r.text}")
-                self.statusBar().showMessage("Upload failed.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
-            self.statusBar().showMessage("Error while uploading file.")
+        elif r.status_code == 201:
+            QMessageBox.information(self, "Success", "File Uploaded Successfully")
+            # Add the new dataset straight from the response and select it
+            self.add_to_history(r.json(), select=True)
+        elif r.status_code == 503:
+            QMessageBox.critical(
+                self, "Error",
+                f"Upload failed: {r.text}\n\nUpload the same file again to retry, "
+                "the chunks already sent are kept."
+            )
+            self.statusBar().showMessage("Upload interrupted.")
+        else:
+            QMessageBox.critical(self, "Error", f"Upload failed: {r.text}")
+            self.statusBar().showMessage("Upload failed.")
+
+    def on_upload_failed(self, error):
+        self.end_upload()
+        QMessageBox.critical(
+            self, "Error",
+            f"{error}\n\nUpload the same file again to resume where it stopped."
+        )
+        self.statusBar().showMessage("Upload interrupted.")
 
     def load_history(self, select_latest=False):
         """
@@ -244,7 +620,8 @@ class MainWindow(QMainWindow):
             f"Logged in as {self.username}. Loading recent datasets..."
         )
         try:
-            r = requests.get(f"{API_URL}/datasets/", headers=self._headers())
+            # Don't wait out a sleeping backend, the cached history is shown instead
+            r = requests.get(f"{API_URL}/datasets/", headers=self._headers(), timeout=10)
             if r.status_code == 200:
                 data = r.json()
 
@@ -263,10 +640,12 @@ class MainWindow(QMainWindow):
                 for item in latest_five:
                     ds_id = str(item['id'])
                     # Cache the full dataset object for later summary display
-                    self.dataset_cache[ds_id] = item
+                    self.remember_summary(item)
                     self.list_history.addItem(
                         f"ID {ds_id} | {item['uploaded_at'][:16]}"
                     )
+                    # Warm the row pages so switching datasets is instant
+                    self.prefetch(cache_key("rows", ds_id), f"{API_URL}/datasets/{ds_id}/raw_data/")
 
                 if latest_five:
                     self.statusBar().showMessage(
@@ -281,15 +660,54 @@ class MainWindow(QMainWindow):
                     self.list_history.setCurrentItem(first_item)
                     self.load_dataset_details(first_item)
 
+            elif self.show_cached_history():
+                self.statusBar().showMessage("Backend unavailable. Showing cached datasets.")
             else:
                 QMessageBox.critical(
                     self, "Error", f"Failed to fetch history: {r.text}"
                 )
                 self.statusBar().showMessage("Failed to load dataset history.")
         except Exception as e:
+            if self.show_cached_history():
+                self.statusBar().showMessage("Backend unavailable. Showing cached datasets.")
+                return
             QMessageBox.critical(self, "Error", str(e))
             self.statusBar().showMessage("Error while loading dataset history.")
 
+    def on_server_event(self, event, data):
+        """Patch the UI from a pushed server event instead of re-fetching the list."""
+        if event == "dataset-created":
+            self.add_to_history(data)
+            self.statusBar().showMessage(f"New dataset ID {data['id']} available.")
+        elif event == "ingest-progress":
+            stage = data.get("stage")
+            if stage == "uploading":
+                self.statusBar().showMessage(
+                    f"Server: receiving {data['filename']} "
+                    f"({data.get('received', 0)}/{data['total_chunks']} chunks)"
+                )
+            else:
+                self.statusBar().showMessage(f"Server: {data['filename']} {stage}")
+
+    def add_to_history(self, item, select=False):
+        """Insert one dataset at the top of the history list, keeping five entries."""
+        ds_id = str(item['id'])
+        if ds_id not in self.dataset_cache:
+            self.remember_summary(item)
+            self.list_history.insertItem(0, f"ID {ds_id} | {item['uploaded_at'][:16]}")
+            self.prefetch(cache_key("rows", ds_id), f"{API_URL}/datasets/{ds_id}/raw_data/")
+            while self.list_history.count() > 5:
+                old = self.list_history.takeItem(self.list_history.count() - 1)
+                self.dataset_cache.pop(old.text().split(" | ")[0].replace("ID ", ""), None)
+
+        if select:
+            for row in range(self.list_history.count()):
+                list_item = self.list_history.item(row)
+                if list_item.text().startswith(f"ID {ds_id} |"):
+                    self.list_history.setCurrentItem(list_item)
+                    self.load_dataset_details(list_item)
+                    break
+
     def load_dataset_details(self, item):
         """When user clicks a dataset in the list, load its summary and raw data."""
         dataset_id = item.text().split(" | ")[0].replace("ID ", "")
@@ -318,57 +736,46 @@ class MainWindow(QMainWindow):
         else:
             # Optional fallback: if not in cache, you can still try detail endpoint
             try:
-                r = requests.get(
-                    f"{API_URL}/datasets/{dataset_id}/",
-                    headers=self._headers()
+                data = json.loads(self.fetch_cached(
+                    cache_key("summary", dataset_id), f"{API_URL}/datasets/{dataset_id}/"
+                ))
+                self.lbl_count.setText(f"Total Units: {data.get('total_count', '-')}")
+                avg_flow = data.get('avg_flowrate', None)
+                avg_press = data.get('avg_pressure', None)
+                avg_temp = data.get('avg_temperature', None)
+
+                self.lbl_flow.setText(
+                    f"Avg Flowrate: {avg_flow:.1f}" if isinstance(avg_flow, (int, float)) else "Avg Flowrate: -"
                 )
-                if r.status_code == 200:
-                    data = r.json()
-                    self.lbl_count.setText(f"Total Units: {data.get('total_count', '-')}")
-                    avg_flow = data.get('avg_flowrate', None)
-                    avg_press = data.get('avg_pressure', None)
-                    avg_temp = data.get('avg_temperature', None)
-
-                    self.lbl_flow.setText(
-                        f"Avg Flowrate: {avg_flow:.1f}" if isinstance(avg_flow, (int, float)) else "Avg Flowrate: -"
-                    )
-                    self.lbl_press.setText(
-                        f"Avg Pressure: {avg_press:.1f}" if isinstance(avg_press, (int, float)) else "Avg Pressure: -"
-                    )
-                    if isinstance(avg_temp, (int, float)):
-                        self.lbl_temp.setText(f"Avg Temp: {avg_temp:.1f}")
-                    else:
-                        self.lbl_temp.setText("Avg Temp: -")
-
-                    dist = data.get('type_distribution', {})
-                    self.plot_charts(dist)
-                    self.statusBar().showMessage(f"Dataset ID {dataset_id} loaded.")
+                self.lbl_press.setText(
+                    f"Avg Pressure: {avg_press:.1f}" if isinstance(avg_press, (int, float)) else "Avg Pressure: -"
+                )
+                if isinstance(avg_temp, (int, float)):
+                    self.lbl_temp.setText(f"Avg Temp: {avg_temp:.1f}")
                 else:
-                    QMessageBox.critical(
-                        self, "Error", f"Failed to fetch summary: {r.text}"
-                    )
-                    self.statusBar().showMessage("Failed to load dataset summary.")
+                    self.lbl_temp.setText("Avg Temp: -")
+
+                dist = data.get('type_distribution', {})
+                self.plot_charts(dist)
+                self.statusBar().showMessage(f"Dataset ID {dataset_id} loaded.")
             except Exception as e:
-                QMessageBox.critical(self, "Error", str(e))
-                self.statusBar().showMessage("Error while loading dataset summary.")
+                QMessageBox.critical(
+                    self, "Error", f"Failed to fetch summary: {e}"
+                )
+                self.statusBar().showMessage("Failed to load dataset summary.")
 
-        # ---- 2. Fetch raw row-level data for table ----
+        # ---- 2. Raw row-level data for table (usually already prefetched) ----
         try:
-            r_raw = requests.get(
-                f"{API_URL}/datasets/{dataset_id}/raw_data/",
-                headers=self._headers()
+            rows = self.fetch_cached(
+                cache_key("rows", dataset_id), f"{API_URL}/datasets/{dataset_id}/raw_data/"
             )
-            if r_raw.status_code == 200:
-                self.fill_table(r_raw.json())
-                # Keep last summary message in status bar
-            else:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to fetch raw data: {r_raw.text}"
-                )
-                self.statusBar().showMessage("Failed to load raw data.")
+            self.fill_table(json.loads(rows))
+            # Keep last summary message in status bar
         except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
-            self.statusBar().showMessage("Error while loading raw data.")
+            QMessageBox.critical(
+                self, "Error", f"Failed to fetch raw data: {e}"
+            )
+            self.statusBar().showMessage("Failed to load raw data.")
 
     def plot_charts(self, distribution):
         """Draw bar chart and pie chart for equipment type distribution."""
@@ -418,16 +825,36 @@ class MainWindow(QMainWindow):
         self.table.setRowCount(0)
         self.statusBar().showMessage("Table cleared.")
 
+    def closeEvent(self, event):
+        self.events.stop()
+        if self.uploader:
+            # The session stays on the server, uploading the file again resumes it
+            self.uploader.cancel()
+        self.prefetch_pool.shutdown(wait=False, cancel_futures=True)
+        self.cache.save()
+        super().closeEvent(event)
+
     def download_pdf(self):
-        """Open the PDF report for the selected dataset in the default browser."""
+        """Open the PDF report for the selected dataset, from the cache when possible."""
         if self.current_dataset_id:
-            import webbrowser
-            webbrowser.open(
-                f"{API_URL}/datasets/{self.current_dataset_id}/generate_pdf/"
-            )
             self.statusBar().showMessage(
                 f"Opening PDF for dataset ID {self.current_dataset_id}..."
             )
+            try:
+                pdf = self.fetch_cached(
+                    cache_key("pdf", self.current_dataset_id),
+                    f"{API_URL}/datasets/{self.current_dataset_id}/generate_pdf/"
+                )
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to fetch PDF: {e}")
+                self.statusBar().showMessage("Failed to load PDF report.")
+                return
+            path = os.path.join(
+                tempfile.gettempdir(), f"report_{self.current_dataset_id}.pdf"
+            )
+            with open(path, "wb") as f:
+                f.write(pdf)
+            webbrowser.open(f"file://{path}")
         else:
             self.statusBar().showMessage("No dataset selected for PDF.")
 